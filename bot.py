@@ -1,13 +1,19 @@
 import os
 import logging
 import json
+import re
 import sys
+import threading
+from functools import lru_cache, wraps
 
 # Check for required dependencies first
 try:
     from telegram import Update
     from telegram.ext import Updater, CommandHandler, CallbackContext, ChatMemberHandler
-    from datetime import datetime
+    from telegram.error import RetryAfter
+    from datetime import datetime, timedelta
+    from concurrent.futures import ThreadPoolExecutor
+    from cachetools import TTLCache
     import time
     import urllib3
 except ImportError as e:
@@ -16,8 +22,22 @@ except ImportError as e:
     print("- python-telegram-bot==13.7")
     print("- python-dotenv==0.19.0") 
     print("- urllib3==1.26.18")
+    print("- cachetools==4.2.2")
     sys.exit(1)
 
+# orjson is optional; fall back to the stdlib json module when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pyahocorasick (in requirements.txt) matches all keywords in one pass; if it is
+# unavailable a precompiled regex is used instead
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Enable logging
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', 
@@ -29,23 +49,70 @@ logger = logging.getLogger(__name__)
 # Get bot token from environment variable
 TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 
+# Public HTTPS base URL for webhook mode; leave unset to use polling (e.g. for local development)
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '').rstrip('/')
+# Port the webhook server listens on
+PORT = int(os.getenv('PORT', '8443'))
+
 # Get channel IDs from environment variable (comma-separated)
 CHANNEL_IDS = os.getenv('CHANNEL_IDS', '')
 if CHANNEL_IDS:
-    CHANNEL_IDS = [int(channel_id.strip()) for channel_id in CHANNEL_IDS.split(',') if channel_id.strip()]
+    # dict.fromkeys drops duplicates while keeping the configured order
+    CHANNEL_IDS = tuple(dict.fromkeys(int(channel_id.strip()) for channel_id in CHANNEL_IDS.split(',') if channel_id.strip()))
 else:
-    CHANNEL_IDS = []
+    CHANNEL_IDS = ()
+
+# Set view of CHANNEL_IDS for O(1) membership checks on every update
+CHANNEL_IDS_SET = frozenset(CHANNEL_IDS)
 
 # Store channel info (ID -> username mapping)
 channel_info = {}
 
 # Suspicious criteria
 MIN_ACCOUNT_AGE_DAYS = 30
-SUSPICIOUS_NAMES = ["deleted account", "bot", "bots", "police", "telegram", "admin", "support", 
-                    "official", "http", "www", ".com", ".ru", ".xyz", "click", "promo", "sales"]
+SUSPICIOUS_NAMES = ("deleted account", "bot", "bots", "police", "telegram", "admin", "support", 
+                    "official", "http", "www", ".com", ".ru", ".xyz", "click", "promo", "sales")
+
+# Name fields scanned for suspicious keywords, in the order they are checked
+NAME_FIELDS = (("username", "username"), ("first_name", "first name"), ("last_name", "last name"))
+# Separator between name fields in the combined scan; never part of a keyword
+NAME_SEPARATOR = "\x00"
+
+def build_keyword_automaton(keywords):
+    """Build an Aho-Corasick automaton matching all keywords in one pass"""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+SUSPICIOUS_AUTOMATON = build_keyword_automaton(SUSPICIOUS_NAMES) if ahocorasick else None
+SUSPICIOUS_RE = re.compile('|'.join(re.escape(keyword) for keyword in SUSPICIOUS_NAMES))
+
+# Number of channels processed concurrently by /approve_all
+CHANNEL_WORKERS = 8
+# Maximum approve/decline calls in flight at once, across all channels
+API_WORKERS = 10
+# HTTP connections kept open to the Bot API: dispatcher workers + job thread + the pools above
+CON_POOL_SIZE = 4 + 1 + CHANNEL_WORKERS + API_WORKERS
+
+# Shared pool for individual join request calls
+api_executor = ThreadPoolExecutor(max_workers=API_WORKERS)
+
+# Telegram's maximum message length
+MAX_MESSAGE_LENGTH = 4096
 
 # File to store left users
 LEFT_USERS_FILE = "left_users.json"
+# Append-only log of changes made since LEFT_USERS_FILE was last written
+LEFT_USERS_LOG = "left_users.jsonl"
+# Seconds between folding the log back into LEFT_USERS_FILE
+COMPACT_INTERVAL_SECONDS = 600
+# Also compact early once this many changes have been logged, to bound replay time
+COMPACT_MAX_CHANGES = 1000
+
+# File to persist channel info across restarts
+CHANNEL_INFO_FILE = "channel_info.json"
 
 def check_environment():
     """Check if all required environment variables are set"""
@@ -65,83 +132,222 @@ def check_environment():
         logger.error("CHANNEL_IDS is empty or not properly formatted")
         return False
     
-    logger.info(f"✅ Environment variables check passed")
-    logger.info(f"📊 Monitoring {len(CHANNEL_IDS)} channels")
+    logger.info("✅ Environment variables check passed")
+    logger.info("📊 Monitoring %s channels", len(CHANNEL_IDS))
     return True
 
+def json_dumps(data):
+    """Serialize data to JSON bytes, using orjson when available"""
+    if orjson:
+        return orjson.dumps(data)
+    # Compact separators match orjson's output, so files look the same either way
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+def json_loads(raw):
+    """Parse JSON bytes, using orjson when available"""
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def apply_left_users_change(data, change):
+    """Apply one logged change ({"u": user_id, "c": channel_id, "op": "add"|"remove"}) to data"""
+    user_id, channel_id = change['u'], change['c']
+    if change['op'] == 'add':
+        data.setdefault(user_id, set()).add(channel_id)
+    elif user_id in data:
+        data[user_id].discard(channel_id)
+        if not data[user_id]:
+            del data[user_id]
+
 def load_left_users():
+    data = {}
     if os.path.exists(LEFT_USERS_FILE):
         try:
-            with open(LEFT_USERS_FILE, 'r') as f:
-                return json.load(f)
+            with open(LEFT_USERS_FILE, 'rb') as f:
+                # Channel IDs are kept as sets in memory for O(1) lookups
+                data = {user_id: set(channel_ids) for user_id, channel_ids in json_loads(f.read()).items()}
         except Exception as e:
-            logger.error(f"Error loading left users: {e}")
-            return {}
-    return {}
+            logger.error("Error loading left users: %s", e)
+            data = {}
+    
+    # Replay changes made after the snapshot was written
+    if os.path.exists(LEFT_USERS_LOG):
+        try:
+            with open(LEFT_USERS_LOG, 'rb') as f:
+                for line in f:
+                    try:
+                        apply_left_users_change(data, json_loads(line))
+                    except ValueError:
+                        # A crash mid-append can leave a truncated last line
+                        logger.warning("Skipping unreadable left users log entry: %r", line)
+        except Exception as e:
+            logger.error("Error replaying left users log: %s", e)
+    return data
+
+def write_json_file(path, data, fsync=False):
+    """Atomically replace path with data serialized as JSON, optionally syncing it to disk first"""
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(json_dumps(data))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_file, path)
 
 def save_left_users(data):
     try:
-        with open(LEFT_USERS_FILE, 'w') as f:
-            json.dump(data, f)
+        # Sorted so the file content does not depend on set iteration order. The
+        # snapshot is fsynced because compaction truncates the change log right
+        # after it; this runs once per compaction rather than once per change
+        write_json_file(LEFT_USERS_FILE, {user_id: sorted(channel_ids) for user_id, channel_ids in data.items()},
+                        fsync=True)
+        return True
     except Exception as e:
-        logger.error(f"Error saving left users: {e}")
+        logger.error("Error saving left users: %s", e)
+        return False
 
 left_users = load_left_users()
 
+# Guards left_users and its files across handler, job and worker threads
+left_users_lock = threading.RLock()
+# Changes appended to LEFT_USERS_LOG since the last compaction
+_logged_changes = 0
+
+def log_left_users_change(user_id, channel_id, op):
+    """Append a single change to the log instead of rewriting the whole file"""
+    global _logged_changes
+    line = json_dumps({"u": user_id, "c": channel_id, "op": op}) + b"\n"
+    with left_users_lock:
+        try:
+            with open(LEFT_USERS_LOG, 'ab') as f:
+                f.write(line)
+        except Exception as e:
+            logger.error("Error logging left users change: %s", e)
+            return
+        
+        _logged_changes += 1
+        if _logged_changes >= COMPACT_MAX_CHANGES:
+            compact_left_users()
+
+def compact_left_users(context: CallbackContext = None):
+    """Write a fresh snapshot of left users and truncate the change log"""
+    global _logged_changes
+    with left_users_lock:
+        if not os.path.exists(LEFT_USERS_LOG) or not os.path.getsize(LEFT_USERS_LOG):
+            return
+        if save_left_users(left_users):
+            open(LEFT_USERS_LOG, 'wb').close()
+            _logged_changes = 0
+
+def load_channel_info():
+    if os.path.exists(CHANNEL_INFO_FILE):
+        try:
+            with open(CHANNEL_INFO_FILE, 'rb') as f:
+                # JSON object keys are strings; channel IDs are ints in memory
+                return {int(channel_id): name for channel_id, name in json_loads(f.read()).items()}
+        except Exception as e:
+            logger.error("Error loading channel info: %s", e)
+    return {}
+
+# Serializes writes of CHANNEL_INFO_FILE from concurrent channel workers
+channel_info_lock = threading.Lock()
+
+def save_channel_info():
+    with channel_info_lock:
+        try:
+            write_json_file(CHANNEL_INFO_FILE, {str(channel_id): name for channel_id, name in list(channel_info.items())})
+        except Exception as e:
+            logger.error("Error saving channel info: %s", e)
+
+channel_info.update(load_channel_info())
+
+def fetch_channel_username(bot, channel_id):
+    """Look up a channel's username via the API and cache it, returning None on failure"""
+    try:
+        chat = bot.get_chat(channel_id)
+        channel_info[channel_id] = chat.username or f"ID_{channel_id}"
+        return channel_info[channel_id]
+    except Exception as e:
+        logger.error("Error getting channel info for %s: %s", channel_id, e)
+        return None
+
+def prefetch_channel_info(bot):
+    """Re-resolve every monitored channel in one pass so renamed channels are picked up"""
+    # A failed lookup leaves the persisted name in place as the fallback
+    for channel_id in CHANNEL_IDS:
+        fetch_channel_username(bot, channel_id)
+    save_channel_info()
+
 def get_channel_username(context, channel_id):
     """Get channel username from ID, with caching"""
-    global channel_info
-    
     if channel_id in channel_info:
         return channel_info[channel_id]
     
-    try:
-        chat = context.bot.get_chat(channel_id)
-        channel_info[channel_id] = chat.username or f"ID_{channel_id}"
-        return channel_info[channel_id]
-    except Exception as e:
-        logger.error(f"Error getting channel info for {channel_id}: {e}")
+    channel_name = fetch_channel_username(context.bot, channel_id)
+    if channel_name is None:
         return f"ID_{channel_id}"
+    save_channel_info()
+    return channel_name
+
+def find_suspicious_keyword(text):
+    """Return (end_index, keyword) for the first suspicious keyword in text, or None"""
+    if SUSPICIOUS_AUTOMATON:
+        return next(SUSPICIOUS_AUTOMATON.iter(text), None)
+    
+    match = SUSPICIOUS_RE.search(text)
+    if match:
+        return match.end() - 1, match.group(0)
+    return None
 
-def is_suspicious_user(user):
+# The same user often shows up in several channels' pending lists, so
+# scan results are cached per combination of name fields
+@lru_cache(maxsize=4096)
+def check_suspicious_names(*values):
+    """Return why the given name fields look suspicious, or None if they don't"""
+    # Scan all name fields at once; the separator count before the
+    # match tells which field it came from
+    combined = NAME_SEPARATOR.join(values)
+    # str.lower() already has an ASCII fast path; non-ASCII names are
+    # casefolded so lookalikes such as "ſupport" still match
+    combined = combined.lower() if combined.isascii() else combined.casefold()
+    
+    match = find_suspicious_keyword(combined)
+    if match:
+        field_index = combined.count(NAME_SEPARATOR, 0, match[0])
+        return f"Suspicious {NAME_FIELDS[field_index][1]}: {values[field_index]}"
+    return None
+
+def get_age_cutoff():
+    """Creation time after which an account counts as too new"""
+    return datetime.now() - timedelta(days=MIN_ACCOUNT_AGE_DAYS)
+
+def is_suspicious_user(user, age_cutoff=None):
     try:
-        if hasattr(user, 'created_at') and user.created_at:
-            account_age_days = (datetime.now() - user.created_at).days
-            if account_age_days < MIN_ACCOUNT_AGE_DAYS:
-                return True, f"Account too new ({account_age_days} days)"
-        
-        if user.username:
-            username_lower = user.username.lower()
-            for keyword in SUSPICIOUS_NAMES:
-                if keyword in username_lower:
-                    return True, f"Suspicious username: {user.username}"
-        
-        if user.first_name:
-            first_name_lower = user.first_name.lower()
-            for keyword in SUSPICIOUS_NAMES:
-                if keyword in first_name_lower:
-                    return True, f"Suspicious first name: {user.first_name}"
-        
-        if user.last_name:
-            last_name_lower = user.last_name.lower()
-            for keyword in SUSPICIOUS_NAMES:
-                if keyword in last_name_lower:
-                    return True, f"Suspicious last name: {user.last_name}"
-        
+        # Cheapest checks first: a missing username needs no further work
         if not user.username:
             return True, "No username"
         
+        if hasattr(user, 'created_at') and user.created_at:
+            if age_cutoff is None:
+                age_cutoff = get_age_cutoff()
+            if user.created_at > age_cutoff:
+                account_age_days = MIN_ACCOUNT_AGE_DAYS - (user.created_at - age_cutoff).days - 1
+                return True, f"Account too new ({max(account_age_days, 0)} days)"
+        
+        reason = check_suspicious_names(user.username, user.first_name or '', user.last_name or '')
+        if reason:
+            return True, reason
+        
         return False, "User appears legitimate"
     except Exception as e:
-        logger.error(f"Error in is_suspicious_user: {e}")
+        logger.error("Error in is_suspicious_user: %s", e)
         return True, f"Error checking user: {e}"
 
 def track_chat_members(update: Update, context: CallbackContext):
-    global left_users
     try:
         if update.chat_member:
             chat_id = update.effective_chat.id
-            if chat_id not in CHANNEL_IDS:
+            if chat_id not in CHANNEL_IDS_SET:
                 return
                 
             old_status = update.chat_member.old_chat_member.status
@@ -151,83 +357,115 @@ def track_chat_members(update: Update, context: CallbackContext):
                 new_status in ['left', 'kicked']):
                 user_id = str(update.chat_member.new_chat_member.user.id)
                 
-                if user_id not in left_users:
-                    left_users[user_id] = []
-                
-                if chat_id not in left_users[user_id]:
-                    left_users[user_id].append(chat_id)
-                    save_left_users(left_users)
+                with left_users_lock:
+                    if user_id not in left_users:
+                        left_users[user_id] = set()
+                    
+                    if chat_id not in left_users[user_id]:
+                        left_users[user_id].add(chat_id)
+                        log_left_users_change(user_id, chat_id, 'add')
                 
                 channel_name = get_channel_username(context, chat_id)
-                logger.info(f"User {user_id} left channel {channel_name}, added to manual approval list")
+                logger.info("User %s left channel %s, added to manual approval list", user_id, channel_name)
     except Exception as e:
-        logger.error(f"Error in track_chat_members: {e}")
+        logger.error("Error in track_chat_members: %s", e)
+
+def call_with_retry(func, *args):
+    """Call a Bot API method, waiting and retrying whenever Telegram asks us to back off"""
+    while True:
+        try:
+            return func(*args)
+        except RetryAfter as e:
+            logger.warning("Rate limited by Telegram, retrying in %ss", e.retry_after)
+            time.sleep(e.retry_after)
+
+def decide_join_request(channel_id, user, age_cutoff):
+    """Decide on a join request without any API calls, returning (approve, reason)"""
+    # Check if user previously left this channel
+    left_channels = left_users.get(str(user.id))
+    if left_channels and channel_id in left_channels:
+        return False, "Previously left this channel"
+    
+    # Check if user is suspicious
+    is_suspicious, reason = is_suspicious_user(user, age_cutoff)
+    return not is_suspicious, reason
+
+def send_join_decision(context, channel_id, channel_name, user, approve, reason):
+    """Approve or decline a single join request"""
+    if approve:
+        call_with_retry(context.bot.approve_chat_join_request, channel_id, user.id)
+        logger.info("Approved user: %s for %s", user.username or user.first_name, channel_name)
+    else:
+        call_with_retry(context.bot.decline_chat_join_request, channel_id, user.id)
+        logger.warning("Declined user: %s for %s - Reason: %s", user.username or user.first_name, channel_name, reason)
+
+def process_channel(context, channel_id, age_cutoff):
+    """Handle all pending join requests of one channel, returning (approved, rejected, report line)"""
+    try:
+        # Get pending join requests for this channel
+        result = call_with_retry(context.bot.get_chat_join_requests, channel_id)
+        pending_requests = [] if not result else result
+        channel_name = get_channel_username(context, channel_id)
+        
+        # Decide on every request up front; that is cheap local work, so only
+        # the approve/decline round trips go to the shared API pool, which
+        # overlaps them and caps in-flight calls across all channels
+        decisions = [(request.from_user, *decide_join_request(channel_id, request.from_user, age_cutoff))
+                     for request in pending_requests]
+        futures = [api_executor.submit(send_join_decision, context, channel_id, channel_name, user, approve, reason)
+                   for user, approve, reason in decisions]
+        
+        approved_count = 0
+        rejected_count = 0
+        failed_count = 0
+        
+        for (user, approve, _), future in zip(decisions, futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error("Error handling join request from %s for %s: %s", user.id, channel_name, e)
+                failed_count += 1
+                continue
+            if approve:
+                approved_count += 1
+            else:
+                rejected_count += 1
+        
+        report = f"{channel_name}: Approved {approved_count}, Rejected {rejected_count}"
+        if failed_count:
+            report += f", Failed {failed_count}"
+        return approved_count, rejected_count, report
+        
+    except Exception as e:
+        channel_name = get_channel_username(context, channel_id)
+        error_msg = f"Error processing {channel_name}: {str(e)}"
+        logger.error(error_msg)
+        return 0, 0, error_msg
 
 def approve_all_pending(context: CallbackContext):
-    global left_users
     try:
         job_data = context.job.context
         chat_id = job_data.get('chat_id')
         specific_channel_id = job_data.get('channel_id')
         
-        channels_to_process = [specific_channel_id] if specific_channel_id else CHANNEL_IDS
+        channels_to_process = (specific_channel_id,) if specific_channel_id else CHANNEL_IDS
         
-        total_approved = 0
-        total_rejected = 0
-        results = []
+        # One clock read for the whole run rather than one per user
+        age_cutoff = get_age_cutoff()
         
-        for channel_id in channels_to_process:
-            if not channel_id:
-                continue
-                
-            try:
-                # Get pending join requests for this channel
-                result = context.bot.get_chat_join_requests(channel_id)
-                pending_requests = [] if not result else result
-                
-                approved_count = 0
-                rejected_count = 0
-                
-                for request in pending_requests:
-                    user = request.from_user
-                    
-                    # Check if user previously left this channel
-                    if str(user.id) in left_users and channel_id in left_users[str(user.id)]:
-                        context.bot.decline_chat_join_request(channel_id, user.id)
-                        channel_name = get_channel_username(context, channel_id)
-                        logger.info(f"Declined user {user.username or user.first_name} (previously left {channel_name})")
-                        rejected_count += 1
-                        continue
-                    
-                    # Check if user is suspicious
-                    is_suspicious, reason = is_suspicious_user(user)
-                    
-                    if not is_suspicious:
-                        # Approve the request
-                        context.bot.approve_chat_join_request(channel_id, user.id)
-                        channel_name = get_channel_username(context, channel_id)
-                        logger.info(f"Approved user: {user.username or user.first_name} for {channel_name}")
-                        approved_count += 1
-                    else:
-                        # Decline the request if suspicious
-                        context.bot.decline_chat_join_request(channel_id, user.id)
-                        channel_name = get_channel_username(context, channel_id)
-                        logger.warning(f"Declined suspicious user: {user.username or user.first_name} for {channel_name} - Reason: {reason}")
-                        rejected_count += 1
-                
-                channel_name = get_channel_username(context, channel_id)
-                results.append(f"{channel_name}: Approved {approved_count}, Rejected {rejected_count}")
-                total_approved += approved_count
-                total_rejected += rejected_count
-                
-                # Add delay between channels to avoid rate limiting
-                time.sleep(1)
-                
-            except Exception as e:
-                channel_name = get_channel_username(context, channel_id)
-                error_msg = f"Error processing {channel_name}: {str(e)}"
-                logger.error(error_msg)
-                results.append(error_msg)
+        # Channels are independent, so their API round trips can overlap; a
+        # single channel is processed inline without spinning up a pool
+        if len(channels_to_process) <= 1:
+            channel_results = [process_channel(context, channel_id, age_cutoff) for channel_id in channels_to_process]
+        else:
+            with ThreadPoolExecutor(max_workers=min(CHANNEL_WORKERS, len(channels_to_process))) as executor:
+                channel_results = list(executor.map(
+                    lambda channel_id: process_channel(context, channel_id, age_cutoff), channels_to_process))
+        
+        # channel_results already has one entry per channel, in channel order
+        total_approved = sum(approved_count for approved_count, _, _ in channel_results)
+        total_rejected = sum(rejected_count for _, rejected_count, _ in channel_results)
+        results = [report for _, _, report in channel_results]
         
         # Send report if in a chat
         if chat_id:
@@ -235,146 +473,159 @@ def approve_all_pending(context: CallbackContext):
             context.bot.send_message(chat_id, summary)
                 
     except Exception as e:
-        logger.error(f"Error in approve_all_pending: {e}")
+        logger.error("Error in approve_all_pending: %s", e)
         if context.job and context.job.context:
             chat_id = context.job.context.get('chat_id')
             if chat_id:
                 context.bot.send_message(chat_id, f"Error processing join requests: {e}")
 
-def start_approval(update: Update, context: CallbackContext):
-    if update.effective_chat.type in ['group', 'supergroup', 'channel']:
-        try:
-            member = context.bot.get_chat_member(update.effective_chat.id, update.effective_user.id)
-            if member.status not in ['administrator', 'creator']:
-                update.message.reply_text("You need to be an admin to use this command.")
-                return
-        except:
-            update.message.reply_text("Error verifying admin status.")
+def reply_in_chunks(message, blocks):
+    """Reply with text blocks packed into as few messages as Telegram's length limit allows"""
+    chunk = []
+    chunk_length = 0
+    for block in blocks:
+        if chunk and chunk_length + len(block) > MAX_MESSAGE_LENGTH:
+            message.reply_text("".join(chunk))
+            chunk = []
+            chunk_length = 0
+        
+        # A single block over the limit has to be cut up
+        while len(block) > MAX_MESSAGE_LENGTH:
+            message.reply_text(block[:MAX_MESSAGE_LENGTH])
+            block = block[MAX_MESSAGE_LENGTH:]
+        
+        chunk.append(block)
+        chunk_length += len(block)
+    
+    if chunk:
+        message.reply_text("".join(chunk))
+
+# Admin status per (chat_id, user_id), so repeated commands skip get_chat_member
+admin_cache = TTLCache(maxsize=1024, ttl=60)
+
+def admin_required(func):
+    """Only run a command handler for admins of the group/channel it was sent in"""
+    @wraps(func)
+    def wrapper(update: Update, context: CallbackContext):
+        if update.effective_chat.type not in ['group', 'supergroup', 'channel']:
+            update.message.reply_text("This command can only be used in group/channel chats.")
             return
         
-        # Check if a specific channel was mentioned
-        specific_channel_id = None
-        if context.args:
-            # Try to parse as channel ID first
+        key = (update.effective_chat.id, update.effective_user.id)
+        is_admin = admin_cache.get(key)
+        if is_admin is None:
             try:
-                channel_arg = int(context.args[0])
-                if channel_arg in CHANNEL_IDS:
-                    specific_channel_id = channel_arg
-                    channel_name = get_channel_username(context, specific_channel_id)
-                    update.message.reply_text(f"Starting approval process for {channel_name}...")
-                else:
-                    update.message.reply_text(f"Channel ID {channel_arg} not found in monitored channels.")
-                    return
-            except ValueError:
-                update.message.reply_text("Please provide a valid channel ID (numeric).")
+                member = context.bot.get_chat_member(*key)
+            except Exception:
+                update.message.reply_text("Error verifying admin status.")
                 return
-        else:
-            update.message.reply_text("Starting approval process for all channels...")
-        
-        # Run approval process with job context to send report
-        context.job_queue.run_once(
-            approve_all_pending, 
-            when=1, 
-            context={'chat_id': update.effective_chat.id, 'channel_id': specific_channel_id}
-        )
-    else:
-        update.message.reply_text("This command can only be used in group/channel chats.")
+            is_admin = admin_cache[key] = member.status in ['administrator', 'creator']
+        
+        if not is_admin:
+            update.message.reply_text("You need to be an admin to use this command.")
+            return
+        return func(update, context)
+    return wrapper
 
-def manual_approve(update: Update, context: CallbackContext):
-    global left_users
-    if update.effective_chat.type in ['group', 'supergroup', 'channel']:
+@admin_required
+def start_approval(update: Update, context: CallbackContext):
+    # Check if a specific channel was mentioned
+    specific_channel_id = None
+    if context.args:
+        # Try to parse as channel ID first
         try:
-            member = context.bot.get_chat_member(update.effective_chat.id, update.effective_user.id)
-            if member.status not in ['administrator', 'creator']:
-                update.message.reply_text("You need to be an admin to use this command.")
+            channel_arg = int(context.args[0])
+            if channel_arg in CHANNEL_IDS_SET:
+                specific_channel_id = channel_arg
+                channel_name = get_channel_username(context, specific_channel_id)
+                update.message.reply_text(f"Starting approval process for {channel_name}...")
+            else:
+                update.message.reply_text(f"Channel ID {channel_arg} not found in monitored channels.")
                 return
-        except:
-            update.message.reply_text("Error verifying admin status.")
+        except ValueError:
+            update.message.reply_text("Please provide a valid channel ID (numeric).")
             return
+    else:
+        update.message.reply_text("Starting approval process for all channels...")
+    
+    # Run approval process with job context to send report
+    context.job_queue.run_once(
+        approve_all_pending, 
+        when=1, 
+        context={'chat_id': update.effective_chat.id, 'channel_id': specific_channel_id}
+    )
+
+@admin_required
+def manual_approve(update: Update, context: CallbackContext):
+    # Check if user ID was provided
+    if not context.args or len(context.args) < 1:
+        update.message.reply_text("Please provide a user ID to approve. Usage: /approve_user <user_id> [channel_id]")
+        return
+    
+    try:
+        user_id = str(context.args[0])
+        channel_id = int(context.args[1]) if len(context.args) > 1 else None
         
-        # Check if user ID was provided
-        if not context.args or len(context.args) < 1:
-            update.message.reply_text("Please provide a user ID to approve. Usage: /approve_user <user_id> [channel_id]")
-            return
+        # If no channel specified, approve for all channels
+        channels_to_approve = (channel_id,) if channel_id else CHANNEL_IDS
         
-        try:
-            user_id = str(context.args[0])
-            channel_id = int(context.args[1]) if len(context.args) > 1 else None
-            
-            # If no channel specified, approve for all channels
-            channels_to_approve = [channel_id] if channel_id else CHANNEL_IDS
+        approved_channels = []
+        for channel in channels_to_approve:
+            if channel not in CHANNEL_IDS_SET:
+                continue
             
-            approved_channels = []
-            for channel in channels_to_approve:
-                if channel not in CHANNEL_IDS:
-                    continue
-                
-                # Remove from left users list for this channel
-                if user_id in left_users and channel in left_users[user_id]:
-                    left_users[user_id].remove(channel)
-                    if not left_users[user_id]:
+            # Remove from left users list for this channel
+            with left_users_lock:
+                left_channels = left_users.get(user_id)
+                if left_channels and channel in left_channels:
+                    left_channels.discard(channel)
+                    if not left_channels:
                         del left_users[user_id]
-                    save_left_users(left_users)
-                
-                # Approve the user for this channel
-                context.bot.approve_chat_join_request(channel, int(user_id))
-                channel_name = get_channel_username(context, channel)
-                logger.info(f"Manually approved user {user_id} for {channel_name}")
-                approved_channels.append(channel_name)
+                    log_left_users_change(user_id, channel, 'remove')
             
-            if approved_channels:
-                channel_list = ", ".join([f"{c}" for c in approved_channels])
-                update.message.reply_text(f"User {user_id} has been manually approved for {channel_list}.")
-            else:
-                update.message.reply_text(f"No channels were approved for user {user_id}.")
-            
-        except ValueError:
-            update.message.reply_text("Please provide valid numeric IDs.")
-        except Exception as e:
-            update.message.reply_text(f"Error approving user: {e}")
-    else:
-        update.message.reply_text("This command can only be used in group/channel chats.")
-
-def list_left_users(update: Update, context: CallbackContext):
-    global left_users
-    if update.effective_chat.type in ['group', 'supergroup', 'channel']:
-        try:
-            member = context.bot.get_chat_member(update.effective_chat.id, update.effective_user.id)
-            if member.status not in ['administrator', 'creator']:
-                update.message.reply_text("You need to be an admin to use this command.")
-                return
-        except:
-            update.message.reply_text("Error verifying admin status.")
-            return
+            # Approve the user for this channel
+            context.bot.approve_chat_join_request(channel, int(user_id))
+            channel_name = get_channel_username(context, channel)
+            logger.info("Manually approved user %s for %s", user_id, channel_name)
+            approved_channels.append(channel_name)
         
-        if not left_users:
-            update.message.reply_text("No users in the manual approval list.")
+        if approved_channels:
+            channel_list = ", ".join([f"{c}" for c in approved_channels])
+            update.message.reply_text(f"User {user_id} has been manually approved for {channel_list}.")
         else:
-            message = "Users requiring manual approval:\n\n"
-            for user_id, channel_ids in left_users.items():
-                channel_names = [get_channel_username(context, channel_id) for channel_id in channel_ids]
-                message += f"User ID: {user_id}\nChannels: {', '.join(channel_names)}\n\n"
-            
-            # Telegram has a message length limit, so we might need to split
-            if len(message) > 4096:
-                parts = [message[i:i+4096] for i in range(0, len(message), 4096)]
-                for part in parts:
-                    update.message.reply_text(part)
-            else:
-                update.message.reply_text(message)
+            update.message.reply_text(f"No channels were approved for user {user_id}.")
+        
+    except ValueError:
+        update.message.reply_text("Please provide valid numeric IDs.")
+    except Exception as e:
+        update.message.reply_text(f"Error approving user: {e}")
+
+@admin_required
+def list_left_users(update: Update, context: CallbackContext):
+    if not left_users:
+        update.message.reply_text("No users in the manual approval list.")
     else:
-        update.message.reply_text("This command can only be used in group/channel chats.")
+        # Resolve each monitored channel's name once, not once per user entry
+        channel_names = {channel_id: get_channel_username(context, channel_id) for channel_id in CHANNEL_IDS}
+        
+        blocks = ["Users requiring manual approval:\n\n"]
+        for user_id, channel_ids in left_users.items():
+            names = ", ".join(channel_names.get(channel_id) or get_channel_username(context, channel_id)
+                              for channel_id in channel_ids)
+            blocks.append(f"User ID: {user_id}\nChannels: {names}\n\n")
+        
+        reply_in_chunks(update.message, blocks)
 
 def list_channels(update: Update, context: CallbackContext):
     if not CHANNEL_IDS:
         update.message.reply_text("No channels are being monitored.")
     else:
-        message = "Channels monitored by this bot:\n\n"
+        blocks = ["Channels monitored by this bot:\n\n"]
         for channel_id in CHANNEL_IDS:
             channel_name = get_channel_username(context, channel_id)
-            message += f"• {channel_name} (ID: {channel_id})\n"
+            blocks.append(f"• {channel_name} (ID: {channel_id})\n")
         
-        update.message.reply_text(message)
+        reply_in_chunks(update.message, blocks)
 
 def start(update: Update, context: CallbackContext):
     help_text = """
@@ -406,7 +657,10 @@ def main():
     
     try:
         # Create the Updater and pass it your bot's token.
-        updater = Updater(TOKEN)
+        updater = Updater(TOKEN, request_kwargs={'con_pool_size': CON_POOL_SIZE})
+
+        # Warm the channel name cache so commands and logs don't wait on get_chat
+        prefetch_channel_info(updater.bot)
 
         # Get the dispatcher to register handlers
         dispatcher = updater.dispatcher
@@ -420,21 +674,41 @@ def main():
         dispatcher.add_handler(CommandHandler("list_channels", list_channels))
         
         # Track when users leave the channels
-        dispatcher.add_handler(ChatMemberHandler(track_chat_members))
+        dispatcher.add_handler(ChatMemberHandler(track_chat_members, ChatMemberHandler.CHAT_MEMBER))
         
         # Log all errors
         dispatcher.add_error_handler(error)
+        
+        # Fold any log left by the previous run into the snapshot (this also drops
+        # a torn last line), then keep doing so periodically
+        compact_left_users()
+        updater.job_queue.run_repeating(compact_left_users, interval=COMPACT_INTERVAL_SECONDS,
+                                        first=COMPACT_INTERVAL_SECONDS)
 
+        # Only ask Telegram for the update types the handlers above consume;
+        # chat_member updates are not sent at all unless requested explicitly
+        allowed_updates = [Update.MESSAGE, Update.CHAT_MEMBER]
+        
         # Start the Bot
-        updater.start_polling()
-        logger.info("✅ Bot started successfully and polling for updates...")
-        logger.info(f"📊 Monitoring {len(CHANNEL_IDS)} channels")
+        if WEBHOOK_URL:
+            # Telegram pushes updates to us, so there is no idle getUpdates traffic
+            updater.start_webhook(listen='0.0.0.0', port=PORT, url_path=TOKEN,
+                                  webhook_url=f"{WEBHOOK_URL}/{TOKEN}", allowed_updates=allowed_updates)
+            logger.info("✅ Bot started successfully and listening for webhook updates on port %s...", PORT)
+        else:
+            # Long polling so idle periods cost one request per 30s
+            updater.start_polling(poll_interval=0.0, timeout=30, allowed_updates=allowed_updates)
+            logger.info("✅ Bot started successfully and polling for updates...")
+        logger.info("📊 Monitoring %s channels", len(CHANNEL_IDS))
         
         # Run the bot until interrupted
         updater.idle()
         
+        # idle() returns once SIGINT/SIGTERM stopped the updater
+        compact_left_users()
+        
     except Exception as e:
-        logger.error(f"❌ Failed to start bot: {e}")
+        logger.error("❌ Failed to start bot: %s", e)
         logger.error("Please check your TELEGRAM_BOT_TOKEN environment variable")
 
 if __name__ == '__main__':
@@ -4,10 +4,14 @@ Check if all required dependencies are installed
 """
 import importlib
 
+# Import names of the packages in requirements.txt
 required_packages = [
     'telegram',
-    'python_dotenv',
-    'urllib3'
+    'dotenv',
+    'urllib3',
+    'orjson',
+    'cachetools',
+    'ahocorasick'
 ]
 
 print("🔍 Checking dependencies...")